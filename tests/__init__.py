@@ -0,0 +1,10 @@
+"""
+Test package for the Product Service
+
+The service connects to its database as soon as it is imported, so the
+in-memory default must be in place before any test module imports it.
+Set DATABASE_URI to run the suite against PostgreSQL instead.
+"""
+import os
+
+os.environ.setdefault("DATABASE_URI", "sqlite:///:memory:")
@@ -0,0 +1,102 @@
+######################################################################
+# Copyright 2016, 2023 John J. Rofrano. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+######################################################################
+"""
+pytest configuration and database fixtures for the test suite
+
+Fixtures:
+  db_transaction - joins db.session into one transaction for a test class
+  db_savepoint   - wraps a single test in a SAVEPOINT inside that transaction
+
+Run the tests on every available core with:
+  pytest -n auto
+
+Each pytest-xdist worker is a separate process, so in-memory SQLite
+databases are already isolated. When DATABASE_URI points at PostgreSQL
+every worker gets its own database (e.g. postgres_gw0, postgres_gw1)
+so that workers never contend on the same tables.
+"""
+import os
+import pytest
+from sqlalchemy import create_engine, delete, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+
+def worker_database_uri(database_uri: str, worker: str) -> str:
+    """Returns a database URI that is private to the given xdist worker
+
+    :param database_uri: the URI the whole test run was configured with
+    :type database_uri: str
+    :param worker: the xdist worker id (e.g. gw0)
+    :type worker: str
+
+    :return: the URI of a database that only this worker uses
+    :rtype: str
+
+    """
+    url = make_url(database_uri)
+    if url.get_backend_name() != "postgresql":
+        return database_uri
+
+    name = f"{url.database}_{worker}"
+    engine = create_engine(url, isolation_level="AUTOCOMMIT")
+    with engine.connect() as connection:
+        exists = connection.scalar(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": name}
+        )
+        if not exists:
+            connection.execute(text(f'CREATE DATABASE "{name}"'))
+    engine.dispose()
+    return url.set(database=name).render_as_string(hide_password=False)
+
+
+# The service connects as soon as it is imported, so this must run first
+WORKER = os.getenv("PYTEST_XDIST_WORKER")
+if WORKER:
+    os.environ["DATABASE_URI"] = worker_database_uri(os.environ["DATABASE_URI"], WORKER)
+
+# pylint: disable=wrong-import-position
+from service.models import db, Product  # noqa: E402
+
+
+######################################################################
+#  F I X T U R E S
+######################################################################
+@pytest.fixture(scope="class")
+def db_transaction():
+    """Joins every session into one external transaction that is never committed"""
+    connection = db.engine.connect()
+    transaction = connection.begin()
+    # start from an empty table; rolled back with the transaction so real data survives
+    connection.execute(delete(Product.__table__))
+    app_session = db.session
+    db.session = scoped_session(
+        sessionmaker(bind=connection, join_transaction_mode="create_savepoint")
+    )
+    yield connection
+    db.session.remove()
+    db.session = app_session
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def db_savepoint(db_transaction):  # pylint: disable=redefined-outer-name
+    """Runs a test inside a SAVEPOINT that is rolled back afterwards"""
+    savepoint = db_transaction.begin_nested()
+    yield
+    db.session.rollback()
+    savepoint.rollback()